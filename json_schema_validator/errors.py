@@ -48,15 +48,34 @@ class ValidationError(ValueError):
         A JavaScript expression that evaluates to the schema that was checked
         at the time validation failed. The expression always starts with a root
         object called ``'schema'``.
+
+    If message_args is given then message is a template that is formatted
+    with those arguments the first time the message is accessed. This
+    avoids computing repr() of possibly large objects that nobody looks at.
+    Note that the message then shows the arguments as they are at the time
+    of that first access, not at the time the error was raised.
     """
 
     def __init__(self, message, new_message=None,
-                 object_expr=None, schema_expr=None):
+                 object_expr=None, schema_expr=None, message_args=None):
         self.message = message
+        self._message_args = message_args
         self.new_message = new_message
         self.object_expr = object_expr
         self.schema_expr = schema_expr
 
+    @property
+    def message(self):
+        if self._message_args is not None:
+            self._message = self._message.format(**self._message_args)
+            self._message_args = None
+        return self._message
+
+    @message.setter
+    def message(self, value):
+        self._message = value
+        self._message_args = None
+
     def __str__(self):
         return ("ValidationError: {0} "
                 "object_expr={1!r}, "
@@ -29,6 +29,8 @@ objects in a consistent way. Implements equivalent of schema:
 from datetime import datetime, timedelta
 import re
 
+from json_schema_validator.misc import STRING_TYPES
+
 
 class datetime_extension(object):
     """
@@ -85,7 +87,7 @@ class timedelta_extension(object):
         """
         Deserialize JSON document (string) to datetime.timedelta instance
         """
-        if not isinstance(doc, basestring):
+        if not isinstance(doc, STRING_TYPES):
             raise TypeError("JSON document must be a string")
         match = cls.PATTERN.match(doc)
         if not match:
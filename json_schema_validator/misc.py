@@ -21,7 +21,50 @@ Stuff that does not belong anywhere else
 """
 
 import decimal
+import functools
 
 
 # List of types recognized as numeric
 NUMERIC_TYPES = (int, float, decimal.Decimal)
+
+# List of types recognized as strings
+try:
+    STRING_TYPES = (basestring,)
+except NameError:
+    # Python 3
+    STRING_TYPES = (str,)
+
+# Python types corresponding to simple JSON types.
+# Note: 'boolean' and 'any' are special cased by the validator
+JSON_TYPE_MAP = {
+    "string": STRING_TYPES,
+    "number": NUMERIC_TYPES,
+    "integer": int,
+    "object": dict,
+    "array": list,
+    "null": type(None),
+}
+
+
+def bounded_cache(max_size):
+    """
+    Decorator that caches the results of a function of one hashable
+    argument. The whole cache is flushed when it grows past max_size
+    entries, exceptions are not cached.
+    """
+    def decorator(func):
+        cache = {}
+
+        @functools.wraps(func)
+        def wrapper(key):
+            try:
+                return cache[key]
+            except KeyError:
+                pass
+            value = func(key)
+            if len(cache) >= max_size:
+                cache.clear()
+            cache[key] = value
+            return value
+        return wrapper
+    return decorator
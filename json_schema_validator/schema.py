@@ -23,7 +23,81 @@ Helper module to work with raw JSON Schema
 import re
 
 from json_schema_validator.errors import SchemaError
-from json_schema_validator.misc import NUMERIC_TYPES
+from json_schema_validator.misc import (
+    NUMERIC_TYPES, STRING_TYPES, bounded_cache)
+
+
+@bounded_cache(1024)
+def _compile_pattern(value):
+    """
+    Compile the regular expression value, reusing earlier compilations
+    """
+    try:
+        return re.compile(value)
+    except re.error as ex:
+        raise SchemaError(
+            "pattern value {0!r} is not a valid regular expression:"
+            " {1}".format(value, str(ex)))
+
+
+# Characters that make a pattern something more than a literal string
+_PATTERN_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
+
+# Pattern that matches ``^.{m,n}$``, capturing m and n
+# (there must be nothing after the final '$', not even a newline, and only
+# ASCII digits are allowed as \d also matches other digits on Python 3)
+_LENGTH_PATTERN = re.compile(r"^\^\.\{([0-9]+),([0-9]+)\}\$\Z")
+
+# Schema properties that do not affect validation apart from the type check
+_TYPE_ONLY_KEYS = frozenset(
+    ["type", "optional", "title", "description", "default"])
+
+
+def _line_length(text):
+    """
+    Return the length of text as seen by a pattern anchored with ``^`` and
+    ``$``, or None if text spans more than one line.
+
+    Like ``$`` this ignores one trailing newline.
+    """
+    if text.endswith("\n"):
+        text = text[:-1]
+    if "\n" in text:
+        return
+    return len(text)
+
+
+@bounded_cache(1024)
+def _pattern_matcher(value):
+    """
+    Build a callable that tells if a string matches the pattern value.
+
+    Patterns that are common in real-world schemas and which can be
+    expressed with plain string operations bypass the regular expression
+    engine entirely. Everything else uses the compiled pattern.
+    """
+    # Compile anyway so that broken patterns are always reported
+    compiled = _compile_pattern(value)
+    if value in (".*", "^.*"):
+        return lambda text: True
+    if value in (".+", "^.+"):
+        return lambda text: text[:1] not in ("", "\n")
+    if value == "^.*$":
+        return lambda text: _line_length(text) is not None
+    if value == "^.+$":
+        return lambda text: bool(_line_length(text))
+    match = _LENGTH_PATTERN.match(value)
+    if match is not None:
+        low, high = int(match.group(1)), int(match.group(2))
+
+        def length_matcher(text):
+            length = _line_length(text)
+            return length is not None and low <= length <= high
+        return length_matcher
+    prefix = value[1:] if value.startswith("^") else value
+    if _PATTERN_METACHARACTERS.isdisjoint(prefix):
+        return lambda text: text.startswith(prefix)
+    return lambda text: compiled.match(text) is not None
 
 
 class Schema(object):
@@ -31,6 +105,12 @@ class Schema(object):
     JSON schema object
     """
 
+    __slots__ = (
+        '_schema', '_type_check_cache', '_child_cache',
+        '_unsupported_checked', '_enum_set_computed', '_enum_set_cache',
+        '_properties_keyset_cache', '_properties_names_cache',
+        '_validator_steps', '_type_only_cache')
+
     def __init__(self, json_obj):
         """
         Initialize schema with JSON object
@@ -42,10 +122,64 @@ class Schema(object):
         if not isinstance(json_obj, dict):
             raise SchemaError("Schema definition must be a JSON object")
         self._schema = json_obj
+        self._reset_caches()
+
+    def _reset_caches(self):
+        self._type_check_cache = None
+        # Sub-schemas built by the validator, keyed by their schema
+        # expression suffix (such as '.properties.foo')
+        self._child_cache = {}
+        self._unsupported_checked = False
+        self._enum_set_computed = False
+        self._enum_set_cache = None
+        self._properties_keyset_cache = None
+        self._properties_names_cache = None
+        # Validation steps that apply to this schema, keyed by the kind of
+        # the validated object, see Validator._compile_steps()
+        self._validator_steps = {}
+        self._type_only_cache = None
+
+    def __getstate__(self):
+        # Only the schema itself is pickled, the caches are rebuilt
+        return {'_schema': self._schema}
+
+    def __setstate__(self, state):
+        self._schema = state['_schema']
+        self._reset_caches()
 
     def __repr__(self):
         return "Schema({0!r})".format(self._schema)
 
+    def _check_unsupported(self):
+        """
+        Raise NotImplementedError if the schema uses any of the properties
+        that the validator does not support yet.
+
+        The checks only depend on the schema so they are done just once,
+        the validator looks at _unsupported_checked to skip them.
+        """
+        if self.minimum is not None:
+            raise NotImplementedError("minimum is not supported")
+        if self.maximum is not None:
+            raise NotImplementedError("maximum is not supported")
+        if self.minItems != 0:
+            raise NotImplementedError("minItems is not supported")
+        if self.maxItems is not None:
+            raise NotImplementedError("maxItems is not supported")
+        if self.uniqueItems != False:
+            raise NotImplementedError("uniqueItems is not supported")
+        if self.minLength != 0:
+            raise NotImplementedError("minLength is not supported")
+        if self.maxLength is not None:
+            raise NotImplementedError("maxLength is not supported")
+        if self.contentEncoding is not None:
+            raise NotImplementedError("contentEncoding is not supported")
+        if self.divisibleBy != 1:
+            raise NotImplementedError("divisibleBy is not supported")
+        if self.disallow is not None:
+            raise NotImplementedError("disallow is not supported")
+        self._unsupported_checked = True
+
     @property
     def type(self):
         """
@@ -65,7 +199,7 @@ class Schema(object):
         * 'any' (default)
         """
         value = self._schema.get("type", "any")
-        if not isinstance(value, (basestring, dict, list)):
+        if not isinstance(value, STRING_TYPES + (dict, list)):
             raise SchemaError(
                 "type value {0!r} is not a simple type name, nested "
                 "schema nor a list of those".format(value))
@@ -93,6 +227,64 @@ class Schema(object):
                         "name".format(js_type))
         return type_list
 
+    def _get_type_check(self, type_map):
+        """
+        The type property digested for the validator.
+
+        The type_map maps simple type names to python types, see
+        :attr:`json_schema_validator.validator.Validator.JSON_TYPE_MAP`.
+        The result is computed once per schema (and type map) and is a
+        tuple with the following items:
+        * True if any type is allowed
+        * True if booleans are allowed
+        * python type, or tuple of python types, matching the simple types
+        * nested schema (the first one listed) or None
+        * the last type name, used for error messages
+        """
+        cache = self._type_check_cache
+        if cache is not None and cache[0] is type_map:
+            return cache[1]
+        type_list = self.type
+        type_classes = []
+        nested_schema = None
+        for json_type in type_list:
+            if isinstance(json_type, dict):
+                if nested_schema is None:
+                    nested_schema = Schema(json_type)
+            elif json_type in type_map:
+                python_type = type_map[json_type]
+                if isinstance(python_type, tuple):
+                    type_classes.extend(python_type)
+                else:
+                    type_classes.append(python_type)
+        if len(type_classes) == 1:
+            # The common case of a single type is checked without
+            # going through a tuple
+            type_classes = type_classes[0]
+        else:
+            type_classes = tuple(type_classes)
+        type_check = (
+            "any" in type_list,
+            "boolean" in type_list,
+            type_classes,
+            nested_schema,
+            type_list[-1])
+        self._type_check_cache = (type_map, type_check)
+        return type_check
+
+    @property
+    def _is_type_only(self):
+        """
+        True if the only thing this schema checks is the type of the
+        object, and only against simple types.
+        """
+        if self._type_only_cache is None:
+            self._type_only_cache = (
+                _TYPE_ONLY_KEYS.issuperset(self._schema)
+                and not any(
+                    isinstance(json_type, dict) for json_type in self.type))
+        return self._type_only_cache
+
     @property
     def properties(self):
         """
@@ -108,6 +300,25 @@ class Schema(object):
                 "properties value {0!r} is not an object".format(value))
         return value
 
+    @property
+    def _properties_keyset(self):
+        """
+        Frozen set of the names of all the properties
+        """
+        if self._properties_keyset_cache is None:
+            self._properties_keyset_cache = frozenset(self.properties)
+        return self._properties_keyset_cache
+
+    @property
+    def _properties_names(self):
+        """
+        Tuple of the names of all the properties, in the order of the
+        properties object
+        """
+        if self._properties_names_cache is None:
+            self._properties_names_cache = tuple(self.properties)
+        return self._properties_names_cache
+
     @property
     def items(self):
         value = self._schema.get("items", {})
@@ -137,7 +348,7 @@ class Schema(object):
     @property
     def requires(self):
         value = self._schema.get("requires", {})
-        if not isinstance(value, (basestring, dict)):
+        if not isinstance(value, STRING_TYPES + (dict,)):
             raise SchemaError(
                 "requires value {0!r} is neither a string nor an"
                 " object".format(value))
@@ -231,12 +442,19 @@ class Schema(object):
         value = self._schema.get("pattern", None)
         if value is None:
             return
-        try:
-            return re.compile(value)
-        except re.error as ex:
-            raise SchemaError(
-                "pattern value {0!r} is not a valid regular expression:"
-                " {1}".format(value, str(ex)))
+        return _compile_pattern(value)
+
+    @property
+    def _pattern_matcher(self):
+        """
+        Callable that checks if a string matches the pattern property.
+
+        :returns None or a callable returning a boolean
+        """
+        value = self._schema.get("pattern", None)
+        if value is None:
+            return
+        return _pattern_matcher(value)
 
     @property
     def minLength(self):
@@ -287,12 +505,29 @@ class Schema(object):
                 seen.add(item)
         return value
 
+    @property
+    def _enum_set(self):
+        """
+        The enum property as a frozenset, for fast membership tests.
+
+        :returns None if enum is not set or contains unhashable values
+        """
+        if not self._enum_set_computed:
+            value = self.enum
+            if value is not None:
+                try:
+                    self._enum_set_cache = frozenset(value)
+                except TypeError:
+                    pass
+            self._enum_set_computed = True
+        return self._enum_set_cache
+
     @property
     def title(self):
         value = self._schema.get("title", None)
         if value is None:
             return
-        if not isinstance(value, basestring):
+        if not isinstance(value, STRING_TYPES):
             raise SchemaError(
                 "title value {0!r} is not a string".format(value))
         return value
@@ -302,7 +537,7 @@ class Schema(object):
         value = self._schema.get("description", None)
         if value is None:
             return
-        if not isinstance(value, basestring):
+        if not isinstance(value, STRING_TYPES):
             raise SchemaError(
                 "description value {0!r} is not a string".format(value))
         return value
@@ -312,11 +547,12 @@ class Schema(object):
         value = self._schema.get("format", None)
         if value is None:
             return
-        if not isinstance(value, basestring):
+        if not isinstance(value, STRING_TYPES):
             raise SchemaError(
                 "format value {0!r} is not a string".format(value))
         if value in [
             'date-time',
+            'regex',
         ]:
             return value
         raise NotImplementedError(
@@ -359,7 +595,7 @@ class Schema(object):
         value = self._schema.get("disallow", None)
         if value is None:
             return
-        if not isinstance(value, (basestring, dict, list)):
+        if not isinstance(value, STRING_TYPES + (dict, list)):
             raise SchemaError(
                 "disallow value {0!r} is not a simple type name, nested "
                 "schema nor a list of those".format(value))
@@ -22,10 +22,21 @@ One liners that make the code shorter
 
 import simplejson
 
+from json_schema_validator.misc import bounded_cache
 from json_schema_validator.schema import Schema
 from json_schema_validator.validator import Validator
 
 
+# Schema objects cache the work done to validate against them so reusing
+# one for the same, exact, schema text saves doing it again
+@bounded_cache(128)
+def _get_schema(schema_text):
+    """
+    Return the (cached) Schema object for the specified schema text
+    """
+    return Schema(simplejson.loads(schema_text))
+
+
 def validate(schema_text, data_text):
     """
     Validate specified JSON text (data_text) with specified schema (schema
@@ -52,6 +63,6 @@ def validate(schema_text, data_text):
 
 
     """
-    schema = Schema(simplejson.loads(schema_text))
+    schema = _get_schema(schema_text)
     data = simplejson.loads(data_text)
     return Validator.validate(schema, data)
@@ -20,13 +20,16 @@
 Unit tests for JSON schema
 """
 
+import pickle
+
 import simplejson
 
 from testscenarios import TestWithScenarios
 from testtools import TestCase
 
-from json_schema_validator.errors import SchemaError
+from json_schema_validator.errors import SchemaError, ValidationError
 from json_schema_validator.schema import Schema
+from json_schema_validator.validator import Validator
 
 
 class SchemaTests(TestWithScenarios, TestCase):
@@ -587,6 +590,12 @@ class SchemaTests(TestWithScenarios, TestCase):
                 'format': "date-time"
             },
         }),
+        ("format_regex", {
+            'schema': '{"format": "regex"}',
+            'expected': {
+                'format': "regex"
+            },
+        }),
         ("format_wrong_type", {
             'schema': '{"format": 5}',
             'access': 'format',
@@ -754,7 +763,7 @@ class SchemaTests(TestWithScenarios, TestCase):
     def test_schema_attribute(self):
         schema = Schema(simplejson.loads(self.schema))
         if hasattr(self, 'expected'):
-            for attr, expected_value in self.expected.iteritems():
+            for attr, expected_value in self.expected.items():
                 self.assertEqual(
                     expected_value, getattr(schema, attr))
         elif hasattr(self, 'access') and hasattr(self, 'raises'):
@@ -771,3 +780,24 @@ class SchemaTests(TestWithScenarios, TestCase):
         else:
             self.fail("Broken test definition, must define 'expected' "
                       "or 'access' and 'raises' scenario attributes")
+
+
+class SchemaPickleTests(TestCase):
+
+    def test_used_schema_survives_pickling(self):
+        schema = Schema({
+            "type": "object",
+            "properties": {"foo": {"type": "string", "pattern": "^f"}}})
+        Validator.validate(schema, {"foo": "foo"})
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            copy = pickle.loads(pickle.dumps(schema, protocol))
+            self.assertEqual(schema.properties, copy.properties)
+            self.assertEqual(True, Validator.validate(copy, {"foo": "foo"}))
+            self.assertRaises(
+                ValidationError, Validator.validate, copy, {"foo": "bar"})
+
+    def test_empty_schema_survives_pickling(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            copy = pickle.loads(pickle.dumps(Schema({}), protocol))
+            self.assertEqual({}, copy.properties)
+            self.assertEqual(True, Validator.validate(copy, 5))
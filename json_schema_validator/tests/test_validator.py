@@ -20,12 +20,16 @@
 Unit tests for JSON schema
 """
 
+import datetime
+
 from testscenarios import TestWithScenarios
 from testtools import TestCase
 
-from json_schema_validator.errors import ValidationError
-from json_schema_validator.shortcuts import validate
-from json_schema_validator.validator import Validator
+from json_schema_validator.errors import SchemaError, ValidationError
+from json_schema_validator.schema import Schema
+from json_schema_validator.shortcuts import _get_schema, validate
+from json_schema_validator.validator import (
+    DATE_TIME_FORMAT, Validator, _is_date_time)
 
 
 class ValidatorFailureTests(TestWithScenarios, TestCase):
@@ -285,6 +289,42 @@ class ValidatorFailureTests(TestWithScenarios, TestCase):
             'object_expr': 'object.bar',
             'schema_expr': 'schema.additionalProperties.type',
         }),
+        ("property_check_reports_first_missing_property", {
+            'schema': """
+            {
+                "type": "object",
+                "properties": {
+                    "a": {},
+                    "b": {},
+                    "c": {},
+                    "d": {}
+                }
+            }
+            """,
+            'data': '{"c": null}',
+            'raises': ValidationError(
+                "{'c': None} does not have property 'a'",
+                "Object lacks property 'a'"),
+            'object_expr': 'object',
+            'schema_expr': 'schema.properties.a.optional',
+        }),
+        ("property_check_reports_missing_before_later_mismatch", {
+            'schema': """
+            {
+                "type": "object",
+                "properties": {
+                    "a": {},
+                    "b": {"type": "number"}
+                }
+            }
+            """,
+            'data': '{"b": "x"}',
+            'raises': ValidationError(
+                "{'b': 'x'} does not have property 'a'",
+                "Object lacks property 'a'"),
+            'object_expr': 'object',
+            'schema_expr': 'schema.properties.a.optional',
+        }),
         ("enum_check_reports_unlisted_values", {
             'schema': '{"enum": [1, 2, 3]}',
             'data': '5',
@@ -303,6 +343,15 @@ class ValidatorFailureTests(TestWithScenarios, TestCase):
             'object_expr': 'object[1]',
             'schema_expr': 'schema.items.type',
         }),
+        ("items_with_single_schema_finds_problems_in_any_item", {
+            'schema': '{"items": {"type": ["string", "null"]}}',
+            'data': '["foo", null, "froz", 5]',
+            'raises': ValidationError(
+                "5 does not match type 'null'",
+                "Object has incorrect type (expected null)"),
+            'object_expr': 'object[3]',
+            'schema_expr': 'schema.items.type',
+        }),
         ("items_with_array_schema_checks_for_too_short_data", {
             'schema': """
             {
@@ -319,6 +368,21 @@ class ValidatorFailureTests(TestWithScenarios, TestCase):
             'object_expr': 'object',
             'schema_expr': 'schema.items',
         }),
+        ("items_with_array_schema_finds_problems", {
+            'schema': """
+            {
+                "items": [
+                    {"type": "string"},
+                    {"type": "boolean"}
+                ]
+            }""",
+            'data': '["foo", 5]',
+            'raises': ValidationError(
+                "5 does not match type 'boolean'",
+                "Object has incorrect type (expected boolean)"),
+            'object_expr': 'object[1]',
+            'schema_expr': 'schema.items[1].type',
+        }),
         ("items_with_array_schema_and_additionalProperties_of_false_checks_for_too_much_data", {
             'schema': """
             {
@@ -460,6 +524,36 @@ class ValidatorFailureTests(TestWithScenarios, TestCase):
             'object_expr': 'object.foo',
             'schema_expr': 'schema.properties.bar.requires.properties.foo.type'
         }),
+        ("requires_with_schema_restores_context_afterwards", {
+            'schema': """
+            {
+                "properties": {
+                    "bar": {
+                        "requires": {
+                            "properties": {
+                                "foo": {
+                                    "type": "number"
+                                }
+                            }
+                        },
+                        "optional": true
+                    },
+                    "foo": {
+                        "optional": true
+                    }
+                },
+                "additionalProperties": {
+                    "type": "null"
+                }
+            }
+            """,
+            'data': '{"bar": null, "foo": 5}',
+            'raises': ValidationError(
+                "5 does not match type 'null'",
+                "Object has incorrect type (expected null)"),
+            'object_expr': 'object.foo',
+            'schema_expr': 'schema.additionalProperties.type'
+        }),
         ("format_date_time_finds_problems", {
             'schema': '{"format": "date-time"}',
             'data': '"broken"',
@@ -469,6 +563,70 @@ class ValidatorFailureTests(TestWithScenarios, TestCase):
             'object_expr': 'object',
             'schema_expr': 'schema.format'
         }),
+        ("format_date_time_finds_invalid_dates", {
+            'schema': '{"format": "date-time"}',
+            'data': '"2010-02-30T14:38:55Z"',
+            'raises': ValidationError(
+                "'2010-02-30T14:38:55Z' is not a string representing JSON"
+                " date-time",
+                "Object is not a string representing JSON date-time"),
+            'object_expr': 'object',
+            'schema_expr': 'schema.format'
+        }),
+        ("format_regex_finds_problems", {
+            'schema': '{"format": "regex"}',
+            'data': '"[a-z"',
+            'raises': ValidationError(
+                "'[a-z' is not a string representing a regex",
+                "Object is not a string representing a regex"),
+            'object_expr': 'object',
+            'schema_expr': 'schema.format'
+        }),
+        ("format_regex_finds_overflowing_repeats", {
+            'schema': '{"format": "regex"}',
+            'data': '"a{99999999999}"',
+            'raises': ValidationError(
+                "'a{99999999999}' is not a string representing a regex",
+                "Object is not a string representing a regex"),
+            'object_expr': 'object',
+            'schema_expr': 'schema.format'
+        }),
+        ("pattern_finds_problems", {
+            'schema': '{"pattern": "[0-9]+$"}',
+            'data': '"12a"',
+            'raises': ValidationError(
+                "'12a' does not match pattern '[0-9]+$'",
+                "Object does not match pattern (expected [0-9]+$)"),
+            'object_expr': 'object',
+            'schema_expr': 'schema.pattern'
+        }),
+        ("pattern_with_prefix_finds_problems", {
+            'schema': '{"pattern": "^x-"}',
+            'data': '"y-foo"',
+            'raises': ValidationError(
+                "'y-foo' does not match pattern '^x-'",
+                "Object does not match pattern (expected ^x-)"),
+            'object_expr': 'object',
+            'schema_expr': 'schema.pattern'
+        }),
+        ("pattern_with_length_range_and_trailing_newline_finds_problems", {
+            'schema': '{"pattern": "^.{3,5}$\\n"}',
+            'data': '"foo"',
+            'raises': ValidationError(
+                "'foo' does not match pattern '^.{3,5}$\\n'",
+                "Object does not match pattern (expected ^.{3,5}$\n)"),
+            'object_expr': 'object',
+            'schema_expr': 'schema.pattern'
+        }),
+        ("pattern_with_length_range_finds_problems", {
+            'schema': '{"pattern": "^.{3,5}$"}',
+            'data': '"foobarfroz"',
+            'raises': ValidationError(
+                "'foobarfroz' does not match pattern '^.{3,5}$'",
+                "Object does not match pattern (expected ^.{3,5}$)"),
+            'object_expr': 'object',
+            'schema_expr': 'schema.pattern'
+        }),
     ]
 
     def test_validation_error_has_proper_message(self):
@@ -571,6 +729,14 @@ class ValidatorSuccessTests(TestWithScenarios, TestCase):
             'schema': '{"type": ["number", "string"]}',
             'data': '"string"',
         }),
+        ("type_list_with_boolean_got_other_value", {
+            'schema': '{"type": ["boolean", "string"]}',
+            'data': '"string"',
+        }),
+        ("type_list_with_nested_schema_before_simple_type", {
+            'schema': '{"type": [{"type": "integer"}, "string"]}',
+            'data': '"string"',
+        }),
         ("property_ignored_on_non_objects", {
             'schema': '{"properties": {"foo": {"type": "number"}}}',
             'data': '"foobar"',
@@ -644,6 +810,10 @@ class ValidatorSuccessTests(TestWithScenarios, TestCase):
             'schema': '{"items": {"type": "string"}}',
             'data': '["foo", "bar", "froz"]',
         }),
+        ("items_with_single_boolean_schema_applies_to_each_item", {
+            'schema': '{"items": {"type": "boolean"}}',
+            'data': '[true, false, true]',
+        }),
         ("items_with_array_schema_applies_to_corresponding_items", {
             'schema': """
             {
@@ -721,12 +891,162 @@ class ValidatorSuccessTests(TestWithScenarios, TestCase):
             """,
             'data': '{}',
         }),
+        ("requires_with_schema_works_when_condition_satisfied", {
+            'schema': """
+            {
+                "properties": {
+                    "foo": {
+                        "optional": true
+                    },
+                    "bar": {
+                        "requires": {
+                            "properties": {
+                                "foo": {
+                                    "type": "number"
+                                }
+                            }
+                        },
+                        "optional": true
+                    }
+                }
+            }
+            """,
+            'data': '{"bar": null, "foo": 5}',
+        }),
         ("format_date_time_works", {
             'schema': '{"format": "date-time"}',
             'data': '"2010-11-12T14:38:55Z"',
         }),
+        ("format_date_time_ignores_non_strings", {
+            'schema': '{"format": "date-time"}',
+            'data': 'null',
+        }),
+        ("format_regex_works", {
+            'schema': '{"format": "regex"}',
+            'data': '"[a-z]+"',
+        }),
+        ("pattern_works", {
+            'schema': '{"pattern": "[0-9]+$"}',
+            'data': '"123"',
+        }),
+        ("pattern_with_prefix_works", {
+            'schema': '{"pattern": "^x-"}',
+            'data': '"x-foo"',
+        }),
+        ("pattern_with_length_range_works", {
+            'schema': '{"pattern": "^.{3,5}$"}',
+            'data': '"foo"',
+        }),
+        ("pattern_matching_everything_works", {
+            'schema': '{"pattern": ".*"}',
+            'data': '""',
+        }),
+        ("pattern_ignores_non_strings", {
+            'schema': '{"pattern": "[0-9]+$"}',
+            'data': '5',
+        }),
     ]
 
     def test_validator_does_not_raise_an_exception(self):
         self.assertEqual(
             True, validate(self.schema, self.data))
+
+
+class ValidatorDateTimeTests(TestCase):
+
+    def test_non_ascii_digits_are_checked_like_strptime(self):
+        text = u"\u0662010-11-12T14:38:55Z"
+        try:
+            datetime.datetime.strptime(text, DATE_TIME_FORMAT)
+        except ValueError:
+            expected = False
+        else:
+            expected = True
+        self.assertEqual(expected, _is_date_time(text))
+
+
+class ValidatorMessageTests(TestCase):
+
+    def test_message_is_formatted_when_raised(self):
+        obj = {'a': [1]}
+        ex = self.assertRaises(
+            ValidationError, Validator.validate,
+            Schema({"type": "string"}), obj)
+        obj['a'].append('changed')
+        self.assertEqual(ex.message, "{'a': [1]} does not match type 'string'")
+
+    def test_lazy_message_is_formatted_on_access(self):
+        obj = {'a': [1]}
+        ex = self.assertRaises(
+            ValidationError, Validator.validate,
+            Schema({"type": "string"}), obj, lazy_messages=True)
+        obj['a'].append('changed')
+        self.assertEqual(
+            ex.message, "{'a': [1, 'changed']} does not match type 'string'")
+        obj['a'].append('again')
+        self.assertEqual(
+            ex.message, "{'a': [1, 'changed']} does not match type 'string'")
+
+    def test_message_can_be_replaced(self):
+        ex = ValidationError(
+            "{obj!r} is wrong", message_args={"obj": 5})
+        ex.message = "{obj!r} is fine"
+        self.assertEqual(ex.message, "{obj!r} is fine")
+
+
+class ValidatorTypeMapTests(TestCase):
+
+    class LongValidator(Validator):
+
+        JSON_TYPE_MAP = dict(
+            Validator.JSON_TYPE_MAP, integer=(int, type(10 ** 30)))
+
+    def test_subclass_type_map_is_used(self):
+        schema = Schema({"type": "integer"})
+        Validator.validate(schema, 10)
+        self.assertEqual(True, self.LongValidator.validate(schema, 10 ** 30))
+
+
+class ValidatorSubclassTests(TestCase):
+
+    class AnyEnumValidator(Validator):
+
+        def _validate_enum(self, obj, schema):
+            pass
+
+    def test_base_class_first(self):
+        schema = Schema({"enum": ["foo"]})
+        self.assertRaises(ValidationError, Validator.validate, schema, "bar")
+        self.assertEqual(True, self.AnyEnumValidator.validate(schema, "bar"))
+        self.assertRaises(ValidationError, Validator.validate, schema, "bar")
+
+    def test_subclass_first(self):
+        schema = Schema({"enum": ["foo"]})
+        self.assertEqual(True, self.AnyEnumValidator.validate(schema, "bar"))
+        self.assertRaises(ValidationError, Validator.validate, schema, "bar")
+        self.assertEqual(True, self.AnyEnumValidator.validate(schema, "bar"))
+
+
+class ValidatorSchemaCacheTests(TestCase):
+
+    def test_shortcut_reuses_schema_for_same_text(self):
+        schema_text = '{"type": "string", "description": "cached"}'
+        validate(schema_text, '"foo"')
+        schema = _get_schema(schema_text)
+        validate(schema_text, '"bar"')
+        self.assertIs(schema, _get_schema(schema_text))
+
+    def test_equal_schemas_are_validated_independently(self):
+        Validator.validate(
+            Schema({"items": [{"type": "string"}]}), ["foo"])
+        self.assertRaises(
+            SchemaError, Validator.validate,
+            Schema({"items": ({"type": "string"},)}), ["foo"])
+
+    def test_changes_to_other_schemas_are_not_seen(self):
+        schema_json = {"title": "changed"}
+        Validator.validate(Schema(schema_json), {"foo": "x"})
+        schema_json["properties"] = {"foo": {"type": "number"}}
+        self.assertEqual(
+            True, Validator.validate(Schema({"title": "changed"}),
+                                     {"foo": "x"}))
@@ -21,14 +21,44 @@ Validator implementation
 """
 
 import datetime
-import itertools
-import types
 import re
 from json_schema_validator.errors import ValidationError
-from json_schema_validator.misc import NUMERIC_TYPES
+from json_schema_validator.misc import JSON_TYPE_MAP, STRING_TYPES
 from json_schema_validator.schema import Schema
 
 
+DATE_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _is_date_time(text):
+    """
+    Check if text is a JSON date-time (see DATE_TIME_FORMAT).
+
+    The canonical YYYY-MM-DDThh:mm:ssZ form is checked by position which
+    is much faster than strptime(). Anything else is left to strptime()
+    that also accepts, for example, single digit months.
+    """
+    if (len(text) == 20 and text[4] == '-' and text[7] == '-'
+        and text[10] == 'T' and text[13] == ':' and text[16] == ':'
+        and text[19] == 'Z'):
+        fields = (text[0:4], text[5:7], text[8:10],
+                  text[11:13], text[14:16], text[17:19])
+        # str.isdigit() would also accept non-ASCII digits
+        if all('0' <= char <= '9' for field in fields for char in field):
+            try:
+                # This checks the ranges, including the number of days
+                # in the month, just like strptime() would
+                datetime.datetime(*[int(field) for field in fields])
+            except ValueError:
+                return False
+            return True
+    try:
+        datetime.datetime.strptime(text, DATE_TIME_FORMAT)
+    except ValueError:
+        return False
+    return True
+
+
 class Validator(object):
     """
     JSON Schema validator.
@@ -37,30 +67,40 @@ class Validator(object):
     :class:`json_schema_validator.schema.Schema`.
     """
 
-    JSON_TYPE_MAP = {
-        "string": basestring,
-        "number": NUMERIC_TYPES,
-        "integer": int,
-        "object": dict,
-        "array": list,
-        "null": types.NoneType,
-    }
+    JSON_TYPE_MAP = JSON_TYPE_MAP
+
+    __slots__ = (
+        '_schema_stack', '_object_stack', '_object_path', '_schema_path',
+        '_object_path_lens', '_schema_path_lens', '_lazy_messages')
 
     def __init__(self):
+        self._lazy_messages = False
         self._schema_stack = []
         self._object_stack = []
+        # Expressions are maintained incrementally, the *_lens stacks hold
+        # the length of the expression before each push.
+        self._object_path = ""
+        self._schema_path = ""
+        self._object_path_lens = []
+        self._schema_path_lens = []
 
     def _push_object(self, obj, path):
         self._object_stack.append((obj, path))
+        self._object_path_lens.append(len(self._object_path))
+        self._object_path += path
 
     def _pop_object(self):
         self._object_stack.pop()
+        self._object_path = self._object_path[:self._object_path_lens.pop()]
 
     def _push_schema(self, schema, path):
         self._schema_stack.append((schema, path))
+        self._schema_path_lens.append(len(self._schema_path))
+        self._schema_path += path
 
     def _pop_schema(self):
         self._schema_stack.pop()
+        self._schema_path = self._schema_path[:self._schema_path_lens.pop()]
 
     @property
     def _object(self):
@@ -71,7 +111,7 @@ class Validator(object):
         return self._schema_stack[-1][0]
 
     @classmethod
-    def validate(cls, schema, obj):
+    def validate(cls, schema, obj, lazy_messages=False):
         """
         Validate specified JSON object obj with specified Schema
         instance schema.
@@ -82,6 +122,13 @@ class Validator(object):
             :class:`json_schema_validator.schema.Schema`
         :param obj:
             JSON object to validate
+        :param lazy_messages:
+            If True, the (deprecated) legacy message of a ValidationError
+            is only formatted when it is first accessed. This is faster for
+            large objects but the message reflects the object at the time
+            of that access, so it should not be modified in the meantime.
+        :type lazy_messages:
+            bool
         :rtype:
             bool
         :returns:
@@ -96,18 +143,23 @@ class Validator(object):
                 "schema value {0!r} is not a Schema"
                 " object".format(schema))
         self = cls()
+        self._lazy_messages = lazy_messages
         self.validate_toplevel(schema, obj)
         return True
 
     def _get_object_expression(self):
-        return "".join(map(lambda x: x[1], self._object_stack))
+        return self._object_path
 
     def _get_schema_expression(self):
-        return "".join(map(lambda x: x[1], self._schema_stack))
+        return self._schema_path
 
     def validate_toplevel(self, schema, obj):
         self._object_stack = []
         self._schema_stack = []
+        self._object_path = ""
+        self._schema_path = ""
+        self._object_path_lens = []
+        self._schema_path_lens = []
         self._push_schema(schema, "schema")
         self._push_object(obj, "object")
         self._validate()
@@ -115,22 +167,60 @@ class Validator(object):
         self._pop_object()
 
     def _validate(self):
-        obj = self._object
-        self._validate_type()
-        self._validate_requires()
+        # Same as self._object and self._schema, without the property calls
+        obj = self._object_stack[-1][0]
+        schema = self._schema_stack[-1][0]
         if isinstance(obj, dict):
-            self._validate_properties()
-            self._validate_additional_properties()
+            kind = "object"
         elif isinstance(obj, list):
-            self._validate_items()
+            kind = "array"
         else:
-            self._validate_enum()
-            self._validate_format()
-            self._validate_pattern()
-        self._report_unsupported()
+            kind = "other"
+        steps = schema._validator_steps.get(kind)
+        if steps is None:
+            steps = self._compile_steps(schema, kind)
+        for step in steps:
+            getattr(self, step)(obj, schema)
+        if not schema._unsupported_checked:
+            schema._check_unsupported()
+
+    def _compile_steps(self, schema, kind):
+        """
+        Compute the names of validation methods that can possibly fail
+        when validating an object of the specified kind against schema.
+
+        The result is stored in the schema so that next time an object of
+        the same kind is validated any checks for properties that are not
+        set are skipped altogether. Names, rather than methods, are stored
+        as the schema may be shared by different validator classes.
+        """
+        allows_any = schema._get_type_check(self.JSON_TYPE_MAP)[0]
+        steps = []
+        if not allows_any:
+            steps.append("_validate_type")
+        if schema.requires != {}:
+            steps.append("_validate_requires")
+        if kind == "object":
+            if schema.properties != {}:
+                steps.append("_validate_properties")
+            # The default, empty, schema accepts every property
+            if schema.additionalProperties != {}:
+                steps.append("_validate_additional_properties")
+        elif kind == "array":
+            if schema.items != {}:
+                steps.append("_validate_items")
+        else:
+            if schema.enum is not None:
+                steps.append("_validate_enum")
+            if schema.format is not None:
+                steps.append("_validate_format")
+            if schema.pattern is not None:
+                steps.append("_validate_pattern")
+        schema._validator_steps[kind] = steps
+        return steps
 
     def _report_error(self, legacy_message, new_message=None,
-                      schema_suffix=None):
+                      schema_suffix=None, **format_args):
         """
         Report an error during validation.
 
@@ -145,29 +235,56 @@ class Validator(object):
         is quite handy to specify the bit that the validator looked at (such as
         the type or optional flag, etc). object_suffix serves the same purpose
         but is used for object expressions instead.
+
+        Any remaining keyword arguments are used to format both messages.
+        Formatting only happens here so that callers never pay for it unless
+        validation fails. With lazy messages enabled, the legacy message is
+        formatted by ValidationError when it is first accessed instead.
         """
+        message_args = None
+        if format_args:
+            if new_message is not None:
+                new_message = new_message.format(**format_args)
+            if self._lazy_messages:
+                message_args = format_args
+            else:
+                legacy_message = legacy_message.format(**format_args)
         object_expr = self._get_object_expression()
         schema_expr = self._get_schema_expression()
         if schema_suffix:
             schema_expr += schema_suffix
         raise ValidationError(legacy_message, new_message, object_expr,
-                              schema_expr)
+                              schema_expr, message_args)
 
     def _push_property_schema(self, prop):
         """
         Construct a sub-schema from the value of the specified attribute
         of the current schema.
         """
-        schema = Schema(self._schema.properties[prop])
-        self._push_schema(schema, ".properties." + prop)
+        path = ".properties." + prop
+        child_cache = self._schema._child_cache
+        schema = child_cache.get(path)
+        if schema is None:
+            schema = child_cache[path] = Schema(
+                self._schema.properties[prop])
+        self._push_schema(schema, path)
 
     def _push_additional_property_schema(self):
-        schema = Schema(self._schema.additionalProperties)
-        self._push_schema(schema, ".additionalProperties")
+        path = ".additionalProperties"
+        child_cache = self._schema._child_cache
+        schema = child_cache.get(path)
+        if schema is None:
+            schema = child_cache[path] = Schema(
+                self._schema.additionalProperties)
+        self._push_schema(schema, path)
 
     def _push_array_schema(self):
-        schema = Schema(self._schema.items)
-        self._push_schema(schema, ".items")
+        path = ".items"
+        child_cache = self._schema._child_cache
+        schema = child_cache.get(path)
+        if schema is None:
+            schema = child_cache[path] = Schema(self._schema.items)
+        self._push_schema(schema, path)
 
     def _push_array_item_object(self, index):
         self._push_object(self._object[index], "[%d]" % index)
@@ -175,118 +292,99 @@ class Validator(object):
     def _push_property_object(self, prop):
         self._push_object(self._object[prop], "." + prop)
 
-    def _report_unsupported(self):
-        schema = self._schema
-        if schema.minimum is not None:
-            raise NotImplementedError("minimum is not supported")
-        if schema.maximum is not None:
-            raise NotImplementedError("maximum is not supported")
-        if schema.minItems != 0:
-            raise NotImplementedError("minItems is not supported")
-        if schema.maxItems is not None:
-            raise NotImplementedError("maxItems is not supported")
-        if schema.uniqueItems != False:
-            raise NotImplementedError("uniqueItems is not supported")
-        if schema.minLength != 0:
-            raise NotImplementedError("minLength is not supported")
-        if schema.maxLength is not None:
-            raise NotImplementedError("maxLength is not supported")
-        if schema.contentEncoding is not None:
-            raise NotImplementedError("contentEncoding is not supported")
-        if schema.divisibleBy != 1:
-            raise NotImplementedError("divisibleBy is not supported")
-        if schema.disallow is not None:
-            raise NotImplementedError("disallow is not supported")
-
-    def _validate_type(self):
-        obj = self._object
-        schema = self._schema
-        for json_type in schema.type:
-            if json_type == "any":
-                return
-            if json_type == "boolean":
-                # Bool is special cased because in python there is no
-                # way to test for isinstance(something, bool) that would
-                # not catch isinstance(1, bool) :/
-                if obj is not True and obj is not False:
-                    self._report_error(
-                        "{obj!r} does not match type {type!r}".format(
-                            obj=obj, type=json_type),
-                        "Object has incorrect type (expected boolean)",
-                        schema_suffix=".type")
-                break
-            elif isinstance(json_type, dict):
-                # Nested type check. This is pretty odd case. Here we
-                # don't change our object stack (it's the same object).
-                self._push_schema(Schema(json_type), ".type")
-                self._validate()
-                self._pop_schema()
-                break
-            else:
-                # Simple type check
-                if isinstance(obj, self.JSON_TYPE_MAP[json_type]):
-                    # First one that matches, wins
-                    break
-        else:
-            self._report_error(
-                "{obj!r} does not match type {type!r}".format(
-                    obj=obj, type=json_type),
-                "Object has incorrect type (expected {type})".format(
-                    type=json_type),
-                schema_suffix=".type")
-    
-    def _validate_pattern(self):
-        ptn = self._schema.pattern
-        obj = self._object
-        
-        if ptn is None:
-          return
-        if not isinstance(obj, basestring):
+    def _validate_each(self, items):
+        """
+        Validate each (obj, path) pair from items against the current
+        schema.
+
+        This is equivalent to calling _push_object(), _validate() and
+        _pop_object() for each pair. As it runs for every element of
+        arrays and objects the stack operations are inlined and bound to
+        local names.
+        """
+        object_push = self._object_stack.append
+        object_pop = self._object_stack.pop
+        path_len_push = self._object_path_lens.append
+        path_len_pop = self._object_path_lens.pop
+        validate = self._validate
+        base_path = self._object_path
+        base_path_len = len(base_path)
+        for item in items:
+            object_push(item)
+            path_len_push(base_path_len)
+            self._object_path = base_path + item[1]
+            validate()
+            object_pop()
+            path_len_pop()
+        self._object_path = base_path
+
+    def _validate_type(self, obj, schema):
+        (allows_any, boolean_allowed, type_classes, nested_schema,
+         last_type) = schema._get_type_check(self.JSON_TYPE_MAP)
+        # The most likely outcome is checked first
+        if type_classes and isinstance(obj, type_classes):
             return
-        
-        if re.match(ptn,obj):
+        # Bool is special cased because in python there is no way to test
+        # for isinstance(something, bool) that would not catch
+        # isinstance(1, bool) :/
+        if boolean_allowed and (obj is True or obj is False):
             return
-        else:
+        if allows_any:
+            return
+        if nested_schema is not None:
+            # Nested type check. This is pretty odd case. Here we
+            # don't change our object stack (it's the same object).
+            self._push_schema(nested_schema, ".type")
+            self._validate()
+            self._pop_schema()
+            return
+        self._report_error(
+            "{obj!r} does not match type {type!r}",
+            "Object has incorrect type (expected {type})",
+            schema_suffix=".type", obj=obj, type=last_type)
+
+    def _validate_pattern(self, obj, schema):
+        matcher = schema._pattern_matcher
+        if matcher is None:
+            return
+        if not isinstance(obj, STRING_TYPES):
+            return
+        if not matcher(obj):
+            ptn = schema.pattern
             self._report_error(
-                "{obj!r} does not match pattern {ptn!r}".format(
-                    obj=obj,ptn=ptn),
-                "Object does not match pattern (expected {ptn})".format(
-                    ptn=ptn),
-                sechema_suffic=".pattern"
-            )
-        
-    def _validate_format(self):
-        fmt = self._schema.format
-        obj = self._object
+                "{obj!r} does not match pattern {ptn!r}",
+                "Object does not match pattern (expected {ptn})",
+                schema_suffix=".pattern", obj=obj, ptn=ptn.pattern)
+
+    def _validate_format(self, obj, schema):
+        fmt = schema.format
         if fmt is None:
             return
+        if not isinstance(obj, STRING_TYPES):
+            return
         if fmt == 'date-time':
-            try:
-                DATE_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
-                datetime.datetime.strptime(obj, DATE_TIME_FORMAT)
-            except ValueError:
+            if not _is_date_time(obj):
                 self._report_error(
-                    "{obj!r} is not a string representing JSON date-time".format(
-                        obj=obj),
+                    "{obj!r} is not a string representing JSON date-time",
                     "Object is not a string representing JSON date-time",
-                    schema_suffix=".format")
-        if fmt == 'regex':
+                    schema_suffix=".format", obj=obj)
+        elif fmt == 'regex':
             try:
                 re.compile(obj)
-            except:
+            except (re.error, OverflowError):
                 self._report_error(
-                    "{obj!r} is not a string representing a regex".format(
-                        obj=obj),
+                    "{obj!r} is not a string representing a regex",
                     "Object is not a string representing a regex",
-                    schema_suffic=".format")
+                    schema_suffix=".format", obj=obj)
         else:
-            raise NotImplementedError("format {0!r} is not supported".format(format))
+            raise NotImplementedError(
+                "format {0!r} is not supported".format(fmt))
 
-    def _validate_properties(self):
-        obj = self._object
-        schema = self._schema
+    def _validate_properties(self, obj, schema):
         assert isinstance(obj, dict)
-        for prop in schema.properties.iterkeys():
+        # Properties are always visited in the order of the schema so
+        # that the reported problem does not depend on set ordering
+        for prop in schema._properties_names:
             self._push_property_schema(prop)
             if prop in obj:
                 self._push_property_object(prop)
@@ -295,55 +393,60 @@ class Validator(object):
             else:
                 if not self._schema.optional:
                     self._report_error(
-                        "{obj!r} does not have property {prop!r}".format(
-                            obj=obj, prop=prop),
-                        "Object lacks property {prop!r}".format(
-                            prop=prop),
-                        schema_suffix=".optional")
+                        "{obj!r} does not have property {prop!r}",
+                        "Object lacks property {prop!r}",
+                        schema_suffix=".optional", obj=obj, prop=prop)
             self._pop_schema()
 
-    def _validate_additional_properties(self):
-        obj = self._object
+    def _validate_additional_properties(self, obj, schema):
         assert isinstance(obj, dict)
-        if self._schema.additionalProperties is False:
+        additional_properties = schema.additionalProperties
+        if additional_properties == {}:
+            # Nothing can fail against an empty schema
+            return
+        if additional_properties is False:
             # Additional properties are disallowed
-            # Report exception for each unknown property
-            for prop in obj.iterkeys():
-                if prop not in self._schema.properties:
+            # Report exception for the first unknown property, in the
+            # order of the object
+            schema_keys = schema._properties_keyset
+            if schema_keys.issuperset(obj):
+                return
+            for prop in obj:
+                if prop not in schema_keys:
                     self._report_error(
                         "{obj!r} has unknown property {prop!r} and"
-                        " additionalProperties is false".format(
-                            obj=obj, prop=prop),
+                        " additionalProperties is false",
                         "Object has unknown property {prop!r} but"
-                        " additional properties are disallowed".format(
-                            prop=prop),
-                        schema_suffix=".additionalProperties")
+                        " additional properties are disallowed",
+                        schema_suffix=".additionalProperties",
+                        obj=obj, prop=prop)
         else:
             # Check each property against this object
             self._push_additional_property_schema()
-            for prop in obj.iterkeys():
-                self._push_property_object(prop)
-                self._validate()
-                self._pop_object()
+            self._validate_each(
+                (value, "." + prop) for prop, value in obj.items())
             self._pop_schema()
 
-    def _validate_enum(self):
-        obj = self._object
-        schema = self._schema
-        if schema.enum is not None:
-            for allowed_value in schema.enum:
-                if obj == allowed_value:
-                    break
-            else:
-                self._report_error(
-                    "{obj!r} does not match any value in enumeration"
-                    " {enum!r}".format(obj=obj, enum=schema.enum),
-                    "Object does not match any value in enumeration",
-                    schema_suffix=".enum")
-
-    def _validate_items(self):
-        obj = self._object
-        schema = self._schema
+    def _validate_enum(self, obj, schema):
+        enum_set = schema._enum_set
+        if enum_set is not None:
+            try:
+                found = obj in enum_set
+            except TypeError:
+                # Unhashable objects can still be equal to enum values
+                found = obj in schema.enum
+        else:
+            if schema.enum is None:
+                return
+            found = obj in schema.enum
+        if not found:
+            self._report_error(
+                "{obj!r} does not match any value in enumeration"
+                " {enum!r}",
+                "Object does not match any value in enumeration",
+                schema_suffix=".enum", obj=obj, enum=schema.enum)
+
+    def _validate_items(self, obj, schema):
         assert isinstance(obj, list)
         items_schema_json = schema.items
         if items_schema_json == {}:
@@ -351,10 +454,20 @@ class Validator(object):
             return
         if isinstance(items_schema_json, dict):
             self._push_array_schema()
-            for index, item in enumerate(obj):
-                self._push_array_item_object(index)
-                self._validate()
-                self._pop_object()
+            items_schema = self._schema
+            if items_schema._is_type_only:
+                allows_any, boolean_allowed, type_classes = (
+                    items_schema._get_type_check(self.JSON_TYPE_MAP)[:3])
+                # Check all the items at once, when that does not work
+                # out go through the items one by one to find and report
+                # the problem.
+                if allows_any or (
+                    not boolean_allowed and
+                    all(isinstance(item, type_classes) for item in obj)):
+                    self._pop_schema()
+                    return
+            self._validate_each(
+                (item, "[%d]" % index) for index, item in enumerate(obj))
             self._pop_schema()
         elif isinstance(items_schema_json, list):
             if len(obj) < len(items_schema_json):
@@ -363,10 +476,9 @@ class Validator(object):
                 # step) as they are validated based on
                 # additionalProperties schema
                 self._report_error(
-                    "{obj!r} is shorter than array schema {schema!r}".
-                    format(obj=obj, schema=items_schema_json),
+                    "{obj!r} is shorter than array schema {schema!r}",
                     "Object array is shorter than schema array",
-                    schema_suffix=".items")
+                    schema_suffix=".items", obj=obj, schema=items_schema_json)
             if len(obj) != len(items_schema_json) and schema.additionalProperties is False:
                 # If our array is not exactly the same size as the
                 # schema and additional properties are disallowed then
@@ -374,30 +486,33 @@ class Validator(object):
                 self._report_error(
                     "{obj!r} is not of the same length as array schema"
                     " {schema!r} and additionalProperties is"
-                    " false".format(obj=obj, schema=items_schema_json),
+                    " false",
                     "Object array is not of the same length as schema array",
-                    schema_suffix=".items")
+                    schema_suffix=".items", obj=obj, schema=items_schema_json)
+            item_schemas = schema._child_cache.get(".items")
+            if item_schemas is None:
+                item_schemas = schema._child_cache[".items"] = [
+                    Schema(item_schema_json)
+                    for item_schema_json in items_schema_json]
             # Validate each array element using schema for the
-            # corresponding array index, fill missing values (since
-            # there may be more items in our array than in the schema)
-            # with additionalProperties which by now is not False
-            for index, (item, item_schema_json) in enumerate(
-                itertools.izip_longest(
-                    obj, items_schema_json,
-                    fillvalue=schema.additionalProperties)):
-                item_schema = Schema(item_schema_json)
-                if index < len(items_schema_json):
-                    self._push_schema(item_schema, "items[%d]" % index)
-                else:
-                    self._push_schema(item_schema, ".additionalProperties")
+            # corresponding array index, use additionalProperties for the
+            # remaining elements (since there may be more items in our
+            # array than in the schema). By now it is not False.
+            num_item_schemas = len(item_schemas)
+            for index in range(min(len(obj), num_item_schemas)):
+                self._push_schema(item_schemas[index], ".items[%d]" % index)
                 self._push_array_item_object(index)
                 self._validate()
                 self._pop_schema()
                 self._pop_object()
+            if len(obj) > num_item_schemas:
+                self._push_additional_property_schema()
+                self._validate_each(
+                    (obj[index], "[%d]" % index)
+                    for index in range(num_item_schemas, len(obj)))
+                self._pop_schema()
 
-    def _validate_requires(self):
-        obj = self._object
-        schema = self._schema
+    def _validate_requires(self, obj, schema):
         requires_json = schema.requires
         if requires_json == {}:
             # default value, don't do anything
@@ -407,34 +522,37 @@ class Validator(object):
             self._report_error(
                 "{obj!r} requires that enclosing object matches"
                 " schema {schema!r} but there is no enclosing"
-                " object".format(obj=obj, schema=requires_json),
+                " object",
                 "Object has no enclosing object that matches schema",
-                schema_suffix=".requires")
+                schema_suffix=".requires", obj=obj, schema=requires_json)
         # Note: Parent object can be None, (e.g. a null property)
         parent_obj = self._object_stack[-2][0]
-        if isinstance(requires_json, basestring):
+        if isinstance(requires_json, STRING_TYPES):
             # This is a simple property test
             if (not isinstance(parent_obj, dict)
                 or requires_json not in parent_obj):
                 self._report_error(
                     "{obj!r} requires presence of property {requires!r}"
-                    " in the same object".format(
-                        obj=obj, requires=requires_json),
-                    "Enclosing object does not have property"
-                    " {prop!r}".format(prop=requires_json),
-                    schema_suffix=".requires")
+                    " in the same object",
+                    "Enclosing object does not have property {requires!r}",
+                    schema_suffix=".requires", obj=obj,
+                    requires=requires_json)
         elif isinstance(requires_json, dict):
             # Requires designates a whole schema, the enclosing object
             # must match against that schema.
-            # Here we resort to a small hack. Proper implementation
-            # would require us to validate the parent object from its
-            # own context (own list of parent objects). Since doing that
-            # and restoring the state would be very complicated we just
-            # instantiate a new validator with a subset of our current
-            # history here.
-            sub_validator = Validator()
-            sub_validator._object_stack = self._object_stack[:-1]
-            sub_validator._schema_stack = self._schema_stack[:]
-            sub_validator._push_schema(
-                Schema(requires_json), ".requires")
-            sub_validator._validate()
+            # The parent object is validated in its own context: the
+            # current object is temporarily taken off the object stack
+            # and put back once the parent has been checked.
+            requires_schema = schema._child_cache.get(".requires")
+            if requires_schema is None:
+                requires_schema = schema._child_cache[".requires"] = Schema(
+                    requires_json)
+            object_item = self._object_stack.pop()
+            object_path = self._object_path
+            self._object_path = object_path[:self._object_path_lens.pop()]
+            self._push_schema(requires_schema, ".requires")
+            self._validate()
+            self._pop_schema()
+            self._object_path_lens.append(len(self._object_path))
+            self._object_path = object_path
+            self._object_stack.append(object_item)